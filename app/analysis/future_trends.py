@@ -1,41 +1,74 @@
 import streamlit as st
-from components.filters import select_car_group, select_rental_period
-from components.charts import create_forecast_chart
-import pandas as pd
+from components.filters import select_car_group, select_rental_period, load_forecast_store
+from components.charts import create_forecast_chart, create_stored_forecast_chart
+from utils import forecast_store
+from utils.forecasting import available_engines
+from utils.rollup import slice_rollup
 
-def render(df):
+def render(df, rollup):
     st.header("Future Trends (Alpha Testing)")
     st.warning("⚠️ This feature is in alpha testing. Predictions may not be accurate.")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
-        selected_car_group = select_car_group(df, key="future")
+        selected_car_group = select_car_group(rollup, key="future")
     with col2:
-        rental_period = select_rental_period(df, key="future")
+        rental_period = select_rental_period(rollup, key="future")
+    with col3:
+        engine = st.selectbox(
+            "Forecast Engine",
+            options=available_engines(),
+            help="holt fits a damped-trend model in milliseconds; prophet is slower",
+            key="forecast_engine_future"
+        )
     
-    filtered_df = df[df['rental_period'] == rental_period]
-    if selected_car_group != 'All':
-        filtered_df = filtered_df[filtered_df['car_group'] == selected_car_group]
+    filtered_rollup = slice_rollup(rollup, rental_period, selected_car_group)
     
-    # Create date column and check for minimum data points
-    filtered_df['date'] = pd.to_datetime(
-        dict(year=filtered_df['year'], 
-             month=filtered_df['month'], 
-             day=filtered_df['day'])
-    ).dt.date
-    daily_data = filtered_df.groupby('date')['total_price'].mean().reset_index()
+    # Check for minimum data points
+    daily_data = filtered_rollup['date'].unique()
     
     if len(daily_data) < 3:
         st.error("Insufficient data for forecasting. Need at least 3 days of data.")
         st.info("Try selecting a different car group or rental period with more historical data.")
-        return
-        
+    elif not render_stored_forecast(filtered_rollup, selected_car_group, rental_period, engine):
+        render_live_forecast(filtered_rollup, engine)
+    
+    render_batch_forecast(rollup, engine)
+
+def render_stored_forecast(filtered_rollup, selected_car_group, rental_period, engine):
+    """Show the batch forecast of the selected segment if it covers the loaded history"""
+    if selected_car_group == 'All':
+        return False
+    
+    store = load_forecast_store(forecast_store.store_version())
+    forecast = forecast_store.stored_forecast(store, selected_car_group, rental_period, engine)
+    if forecast is None or forecast['history_end'].iloc[0] < filtered_rollup['date'].max():
+        return False
+    
+    st.caption(f"Batch forecast generated {forecast['generated_at'].iloc[0]:%Y-%m-%d %H:%M}")
+    st.plotly_chart(create_stored_forecast_chart(filtered_rollup, forecast), use_container_width=True)
+    return True
+
+def render_live_forecast(filtered_rollup, engine):
     try:
-        forecast_fig = create_forecast_chart(filtered_df)
+        forecast_fig = create_forecast_chart(filtered_rollup, engine)
         if forecast_fig is None:
             st.error("Prophet is not installed. Please run: `pip install prophet`")
         else:
             st.plotly_chart(forecast_fig, use_container_width=True)
     except ValueError as e:
         st.error(str(e))
-        st.info("Try selecting a different car group or rental period with more data points.")
\ No newline at end of file
+        st.info("Try selecting a different car group or rental period with more data points.")
+
+def render_batch_forecast(rollup, engine):
+    if not st.button("Forecast all segments", help="Fit every car group and rental period in parallel and store the results"):
+        return
+    
+    with st.spinner(f"Forecasting every segment on {forecast_store.FORECAST_MAX_WORKERS} processes..."):
+        store, failed = forecast_store.run_batch_forecast(rollup, engine)
+    
+    if failed:
+        st.warning(f"Forecasting failed for {len(failed)} segment(s), e.g. {failed[0]}.")
+    if not store.empty:
+        segments = len(store[forecast_store.SEGMENT_COLUMNS].drop_duplicates())
+        st.success(f"Stored forecasts for {segments} segments")
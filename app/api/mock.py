@@ -1,24 +1,165 @@
-from fastapi import FastAPI
 import json
-from fastapi.responses import JSONResponse
 import os
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 from typing import Optional
 
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+
+from .synthetic import generate_snapshot_records, parse_datetime_param
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# "fixtures" serves app/api/data/*.json, "generated" serves synthetic offers
+MOCK_DATASET = os.environ.get("MOCK_DATASET", "fixtures")
+MOCK_ROWS_PER_SNAPSHOT = int(os.environ.get("MOCK_ROWS_PER_SNAPSHOT", 10000))
+MOCK_MAX_SNAPSHOTS = int(os.environ.get("MOCK_MAX_SNAPSHOTS", 512))
+MOCK_LATENCY_MS = float(os.environ.get("MOCK_LATENCY_MS", 0))
+MOCK_LATENCY_JITTER_MS = float(os.environ.get("MOCK_LATENCY_JITTER_MS", 0))
+MOCK_FAILURE_RATE = float(os.environ.get("MOCK_FAILURE_RATE", 0))
+MOCK_FAILURE_STATUS = int(os.environ.get("MOCK_FAILURE_STATUS", 503))
+
+
+def snapshot_key(search_datetime):
+    """Snapshots are hourly, so the key ignores minutes and seconds"""
+    return search_datetime.strftime("%Y-%m-%dT%H")
+
+
+def window_key(pickup_datetime, dropoff_datetime):
+    return (
+        parse_datetime_param(pickup_datetime).isoformat(),
+        parse_datetime_param(dropoff_datetime).isoformat(),
+    )
+
+
+class MockStore:
+    """In-memory, indexed offers for every query the frontend sends"""
+
+    def __init__(self, dataset=MOCK_DATASET, rows_per_snapshot=MOCK_ROWS_PER_SNAPSHOT, max_snapshots=MOCK_MAX_SNAPSHOTS):
+        self.dataset = dataset
+        self.rows_per_snapshot = rows_per_snapshot
+        self.max_snapshots = max_snapshots
+        self.lock = threading.Lock()
+        # (table_name, snapshot_key) -> rows and (table_name, pickup, dropoff) -> rows
+        self.snapshots = OrderedDict()
+        self.windows = OrderedDict()
+        self.table_rows = defaultdict(list)
+        if dataset == "fixtures":
+            self.load_fixtures()
+
+    def load_fixtures(self):
+        for file_name in sorted(os.listdir(DATA_DIRECTORY)):
+            if not file_name.endswith("_processed_limit_5.json"):
+                continue
+            table_name = file_name[: -len("_processed_limit_5.json")]
+            with open(os.path.join(DATA_DIRECTORY, file_name)) as f:
+                rows = json.load(f)
+
+            self.table_rows[table_name] = rows
+            for row in rows:
+                searched_at = datetime(row["year"], row["month"], row["day"], row["hour"])
+                self.snapshots.setdefault((table_name, snapshot_key(searched_at)), []).append(row)
+                key = window_key(row["pickup_datetime"], row["dropoff_datetime"])
+                self.windows.setdefault((table_name, *key), []).append(row)
+
+    def remember(self, index, key, rows):
+        with self.lock:
+            index[key] = rows
+            index.move_to_end(key)
+            while len(index) > self.max_snapshots:
+                index.popitem(last=False)
+        return rows
+
+    def lookup(self, index, key):
+        with self.lock:
+            rows = index.get(key)
+            if rows is not None:
+                index.move_to_end(key)
+            return rows
+
+    def snapshot(self, table_name, search_datetime):
+        searched_at = parse_datetime_param(search_datetime)
+        key = (table_name, snapshot_key(searched_at))
+        rows = self.lookup(self.snapshots, key)
+        if rows is not None or self.dataset == "fixtures":
+            return rows or []
+
+        rows = generate_snapshot_records(table_name, searched_at.replace(minute=0, second=0), self.rows_per_snapshot)
+        return self.remember(self.snapshots, key, rows)
+
+    def custom_search(self, table_name, pickup_datetime, dropoff_datetime):
+        key = (table_name, *window_key(pickup_datetime, dropoff_datetime))
+        rows = self.lookup(self.windows, key)
+        if rows is not None or self.dataset == "fixtures":
+            return rows or []
+
+        searched_at = datetime.now().replace(minute=0, second=0, microsecond=0)
+        rows = generate_snapshot_records(
+            table_name,
+            searched_at,
+            self.rows_per_snapshot,
+            parse_datetime_param(pickup_datetime),
+            parse_datetime_param(dropoff_datetime),
+        )
+        return self.remember(self.windows, key, rows)
+
+    def query(self, table_name, search_datetime=None, pickup_datetime=None, dropoff_datetime=None, limit=5, offset=0):
+        """Filter on every /items/ parameter and return one page of rows"""
+        if search_datetime:
+            rows = self.snapshot(table_name, search_datetime)
+        elif pickup_datetime and dropoff_datetime:
+            rows = self.custom_search(table_name, pickup_datetime, dropoff_datetime)
+        else:
+            rows = self.table_rows.get(table_name, [])
+
+        if search_datetime and (pickup_datetime or dropoff_datetime):
+            pickup = parse_datetime_param(pickup_datetime) if pickup_datetime else None
+            dropoff = parse_datetime_param(dropoff_datetime) if dropoff_datetime else None
+            rows = [
+                row
+                for row in rows
+                if (pickup is None or parse_datetime_param(row["pickup_datetime"]) == pickup)
+                and (dropoff is None or parse_datetime_param(row["dropoff_datetime"]) == dropoff)
+            ]
+        return rows[offset : offset + limit]
+
+
+store = MockStore()
 app = FastAPI()
 
 
+def simulate_network():
+    """Artificial latency and failure injection, configured through MOCK_* variables"""
+    delay_ms = MOCK_LATENCY_MS + random.uniform(0, MOCK_LATENCY_JITTER_MS)
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000)
+    return random.random() < MOCK_FAILURE_RATE
+
+
+# A plain def runs in FastAPI's threadpool, so generating and serialising
+# snapshots does not block the event loop for concurrent requests
 @app.get("/items/")
-async def read_items(
+def read_items(
     table_name: str,
+    search_datetime: Optional[str] = None,
     pickup_datetime: Optional[str] = None,
     dropoff_datetime: Optional[str] = None,
     limit: int = 5,
+    offset: int = 0,
 ):
-    current_directory = os.getcwd()
-    data_directory = os.path.join(current_directory, "app/v2/api/data")
-    file_path = os.path.join(data_directory, f"{table_name}_processed_limit_5.json")
-    with open(file_path) as f:
-        data = json.load(f)
-    filtered_data = data[:limit]
+    if simulate_network():
+        return JSONResponse(status_code=MOCK_FAILURE_STATUS, content={"detail": "Injected failure"})
+
+    filtered_data = store.query(table_name, search_datetime, pickup_datetime, dropoff_datetime, limit, offset)
+    if orjson:
+        return Response(content=orjson.dumps(filtered_data), media_type="application/json")
     return JSONResponse(content=filtered_data)
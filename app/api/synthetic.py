@@ -0,0 +1,138 @@
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+SOURCES = ["do_you_spain", "rental_cars", "holiday_autos"]
+SUPPLIERS = [
+    "GREEN MOTION",
+    "ALAMO",
+    "AVIS",
+    "BUDGET",
+    "ENTERPRISE",
+    "EUROPCAR",
+    "HERTZ",
+    "SIXT",
+    "THRIFTY",
+    "DOLLAR",
+    "NATIONAL",
+    "KEDDY BY EUROPCAR",
+]
+# car_group -> (make, model, transmission, base price per day)
+CAR_GROUPS = {
+    "1A": ("FIAT", "500", "MANUAL", 28.0),
+    "1B": ("VOLKSWAGEN", "POLO", "MANUAL", 32.0),
+    "1C": ("FORD", "FOCUS", "MANUAL", 36.0),
+    "1D": ("VAUXHALL", "ASTRA", "AUTOMATIC", 41.0),
+    "1E": ("TOYOTA", "COROLLA", "AUTOMATIC", 44.0),
+    "1F": ("SKODA", "OCTAVIA ESTATE", "MANUAL", 47.0),
+    "1G": ("NISSAN", "QASHQAI", "MANUAL", 52.0),
+    "1H": ("KIA", "SPORTAGE", "AUTOMATIC", 58.0),
+    "1I": ("BMW", "3 SERIES", "AUTOMATIC", 66.0),
+    "1J": ("MERCEDES", "C CLASS", "AUTOMATIC", 74.0),
+    "1K": ("VOLVO", "XC60", "AUTOMATIC", 82.0),
+    "1L": ("FORD", "GALAXY", "MANUAL", 70.0),
+    "1M": ("VOLKSWAGEN", "TRANSPORTER", "MANUAL", 88.0),
+    "1N": ("AUDI", "A6", "AUTOMATIC", 95.0),
+    "1ELE": ("NISSAN", "LEAF", "AUTOMATIC", 55.0),
+    "2ELE": ("TESLA", "MODEL 3", "AUTOMATIC", 85.0),
+}
+RENTAL_PERIODS = list(range(1, 31))
+PICKUP_HOUR = 10
+PICKUP_LEAD_DAYS = 31
+
+
+def seed_for(*parts):
+    """Stable seed so the same request always returns the same offers"""
+    return zlib.crc32("|".join(str(part) for part in parts).encode())
+
+
+def generate_snapshot(table_name, search_datetime, rows, pickup_datetime=None, dropoff_datetime=None):
+    """Offers for one source and search datetime as a DataFrame.
+
+    With pickup/dropoff given, every offer is for that custom window and
+    rental_period is "custom", as the scraper reports it.
+    """
+    rng = np.random.default_rng(
+        seed_for(table_name, search_datetime, pickup_datetime, dropoff_datetime)
+    )
+    car_groups = list(CAR_GROUPS)
+    group_idx = rng.integers(0, len(car_groups), rows)
+    supplier_idx = rng.integers(0, len(SUPPLIERS), rows)
+
+    if pickup_datetime is not None:
+        pickup = np.full(rows, np.datetime64(pickup_datetime))
+        dropoff = np.full(rows, np.datetime64(dropoff_datetime))
+        periods = (dropoff - pickup).astype("timedelta64[D]").astype(int)
+        rental_period = np.full(rows, "custom", dtype=object)
+    else:
+        pickup_day = (search_datetime + timedelta(days=PICKUP_LEAD_DAYS)).replace(
+            hour=PICKUP_HOUR, minute=0, second=0
+        )
+        periods = rng.choice(RENTAL_PERIODS, rows)
+        pickup = np.full(rows, np.datetime64(pickup_day))
+        dropoff = pickup + periods.astype("timedelta64[D]")
+        rental_period = periods
+
+    base_per_day = np.array([CAR_GROUPS[group][3] for group in car_groups])[group_idx]
+    supplier_factor = 0.85 + 0.3 * (supplier_idx / len(SUPPLIERS))
+    # Longer rentals get a lower daily rate, with per-offer noise on top
+    discount = 1 - 0.25 * (np.maximum(periods, 1) - 1) / 29
+    price_per_day = np.round(
+        base_per_day * supplier_factor * discount * rng.normal(1.0, 0.08, rows), 2
+    )
+    total_price = np.round(price_per_day * np.maximum(periods, 1), 2)
+
+    vehicles = np.array([CAR_GROUPS[group][:3] for group in car_groups], dtype=object)[group_idx]
+    return pd.DataFrame(
+        {
+            "make": vehicles[:, 0],
+            "model": vehicles[:, 1],
+            "transmission": vehicles[:, 2],
+            "car_group": np.array(car_groups, dtype=object)[group_idx],
+            "supplier": np.array(SUPPLIERS, dtype=object)[supplier_idx],
+            "total_price": total_price,
+            "price_per_day": price_per_day,
+            "pickup_datetime": np.datetime_as_string(pickup, unit="ms"),
+            "dropoff_datetime": np.datetime_as_string(dropoff, unit="ms"),
+            "rental_period": rental_period,
+            "source": table_name,
+            "day": search_datetime.day,
+            "month": search_datetime.month,
+            "year": search_datetime.year,
+            "hour": search_datetime.hour,
+        }
+    )
+
+
+def generate_snapshot_records(table_name, search_datetime, rows, pickup_datetime=None, dropoff_datetime=None):
+    """Same offers as generate_snapshot, as JSON-ready row dicts"""
+    return generate_snapshot(
+        table_name, search_datetime, rows, pickup_datetime, dropoff_datetime
+    ).to_dict("records")
+
+
+def parse_datetime_param(value):
+    """Accept the frontend's formats, e.g. 2024-11-16T12:00:00:00 or 2024-11-16 12:00"""
+    return datetime.fromisoformat(value.replace(" ", "T")[:19].rstrip(":"))
+
+
+def generate_market_data(rows, search_datetimes=None, sources=SOURCES):
+    """A multi-source, multi-snapshot market of roughly `rows` offers.
+
+    Defaults to the 31 daily 12:00 snapshots Market Analysis loads, ending
+    yesterday, split evenly across sources and snapshots.
+    """
+    if search_datetimes is None:
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        search_datetimes = [today - timedelta(days=days) for days in range(31, 0, -1)]
+
+    rows_per_snapshot = max(rows // (len(sources) * len(search_datetimes)), 1)
+    return pd.concat(
+        [
+            generate_snapshot(source, search_datetime, rows_per_snapshot)
+            for search_datetime in search_datetimes
+            for source in sources
+        ],
+        ignore_index=True,
+    )
@@ -1,14 +1,190 @@
+import os
+import json
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BASE_URL = "https://zhjlsusdz3.execute-api.eu-west-2.amazonaws.com/prod/"
 
+CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", 60))
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", 16))
+MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", 3))
+# Read timeouts are not retried: a hung request would otherwise hold a worker
+# for (MAX_RETRIES + 1) * READ_TIMEOUT
+MAX_READ_RETRIES = int(os.environ.get("API_MAX_READ_RETRIES", 0))
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Matches the single limit=10000 request used before paging, so typical snapshots
+# still arrive in one page even if the gateway ignores offset
+PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 10000))
+MAX_ROWS = int(os.environ.get("API_MAX_ROWS", 100000))
+
+# Known /items/ fields and the dtype each column is assembled with
+ITEM_SCHEMA = {
+    "make": object,
+    "model": object,
+    "transmission": object,
+    "car_group": object,
+    "supplier": object,
+    "total_price": np.float64,
+    "price_per_day": np.float64,
+    "pickup_datetime": object,
+    "dropoff_datetime": object,
+    "rental_period": np.int64,
+    "day": np.int64,
+    "month": np.int64,
+    "year": np.int64,
+    "hour": np.int64,
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session():
+    """Create a keep-alive session with bounded, jittered retries"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        read=MAX_READ_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+    )
+    return session
+
 
-def get_request(api_url):
+def get_session():
+    """Return the process-wide session shared by every data loader"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get_response(api_url, timeout=None):
     full_url = f"{BASE_URL.rstrip('/')}{api_url}"
 
+    response = get_session().get(
+        full_url, timeout=timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    )
+    response.raise_for_status()
+    return response
+
+
+def get_request(api_url, timeout=None):
     try:
-        response = requests.get(full_url)
-        response.raise_for_status()
-        return response.json()
+        return get_response(api_url, timeout).json()
     except Exception as e:
         raise e
+
+
+def loads(content):
+    return orjson.loads(content) if orjson else json.loads(content)
+
+
+def assemble_column(values, dtype):
+    try:
+        return np.array(values, dtype=dtype)
+    except (TypeError, ValueError):
+        # e.g. rental_period "custom" in custom searches keeps its raw values
+        return np.array(values, dtype=object)
+
+
+def decode_items(content):
+    """Decode an /items/ response body straight into typed columns"""
+    rows = loads(content)
+    if not rows:
+        return pd.DataFrame()
+    if not isinstance(rows, list) or not set(ITEM_SCHEMA).issubset(rows[0]):
+        return pd.DataFrame(rows)
+
+    try:
+        return pd.DataFrame(
+            {
+                column: assemble_column(
+                    [row[column] for row in rows], ITEM_SCHEMA.get(column, object)
+                )
+                for column in rows[0]
+            }
+        )
+    except KeyError:
+        # Rows with differing keys take the generic row-wise path
+        return pd.DataFrame(rows)
+
+
+def iter_pages(api_url, page_size=PAGE_SIZE, max_rows=MAX_ROWS):
+    """Yield (page_df, truncated) for an /items/ query using limit/offset paging"""
+    offset = 0
+    previous_first_row = None
+    while offset < max_rows:
+        limit = min(page_size, max_rows - offset)
+        is_last_page = offset + limit >= max_rows
+        # Ask the final page for one extra row to learn whether more data exists
+        request_limit = limit + 1 if is_last_page else limit
+
+        separator = "&" if "?" in api_url else "?"
+        response = get_response(
+            f"{api_url}{separator}limit={request_limit}&offset={offset}"
+        )
+        page = decode_items(response.content)
+        if page.empty:
+            return
+
+        # A gateway that ignores offset serves the first page again; fetch the
+        # whole result in one request instead and yield the rows not seen yet
+        first_row = page.iloc[:1]
+        if previous_first_row is not None and first_row.equals(previous_first_row):
+            warnings.warn(
+                f"{api_url} ignored offset {offset}; refetching it in a single request",
+                RuntimeWarning,
+            )
+            response = get_response(f"{api_url}{separator}limit={max_rows + 1}")
+            rows = decode_items(response.content)
+            yield rows.iloc[offset:max_rows], len(rows) > max_rows
+            return
+        previous_first_row = first_row
+
+        truncated = is_last_page and len(page) > limit
+        yield page.iloc[:limit], truncated
+        if len(page) < limit or is_last_page:
+            return
+        offset += limit
+
+
+def get_paginated_frame(api_url, page_size=PAGE_SIZE, max_rows=MAX_ROWS):
+    """Stream every page into DataFrame chunks; df.attrs["truncated"] flags a capped result"""
+    chunks = []
+    truncated = False
+    for page, page_truncated in iter_pages(api_url, page_size, max_rows):
+        chunks.append(page)
+        truncated = page_truncated
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    df.attrs["truncated"] = truncated
+    return df
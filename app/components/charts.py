@@ -1,54 +1,50 @@
 import plotly.graph_objects as go
-import pandas as pd
 import streamlit as st
 from datetime import datetime, timedelta
+from utils.forecasting import (
+    DEFAULT_FORECAST_ENGINE,
+    FORECAST_ENGINES,
+    FORECAST_PERIODS,
+    available_engines,
+    run_forecast,
+    to_forecast_frame,
+)
+from utils.rollup import summarize_rollup
 
-def prepare_forecast_data(df):
-    """Prepare data for Prophet forecasting"""
-    # Convert date components to datetime
-    df['date'] = pd.to_datetime(
-        dict(year=df['year'], month=df['month'], day=df['day'])
-    ).dt.date
-    
-    # Calculate daily average price
-    forecast_df = df.groupby('date')['total_price'].mean().reset_index()
-    
-    # Rename columns to Prophet requirements
-    forecast_df.columns = ['ds', 'y']
-    
-    # Drop any NaN values
-    forecast_df = forecast_df.dropna()
-    
-    return forecast_df
+FORECAST_CACHE_SIZE = 128
 
-def create_forecast_chart(df):
-    """Create forecast chart using Prophet"""
-    try:
-        from prophet import Prophet
-    except ImportError:
+def prepare_forecast_data(rollup):
+    """Prepare data for forecasting from a daily rollup slice"""
+    # Daily average price as ds/y, without NaN values
+    return to_forecast_frame(summarize_rollup(rollup, 'date'))
+
+@st.cache_data(max_entries=FORECAST_CACHE_SIZE, show_spinner=False)
+def fit_forecast(forecast_df, engine, periods, params):
+    """run_forecast cached on the daily series, engine and model parameters"""
+    return run_forecast(forecast_df, engine, periods, params)
+
+def create_forecast_chart(rollup, engine=DEFAULT_FORECAST_ENGINE):
+    """Create forecast chart with the chosen forecasting engine"""
+    if engine not in available_engines():
         return None
     
-    # Prepare data for Prophet
-    forecast_df = prepare_forecast_data(df)
+    # Prepare data for forecasting
+    forecast_df = prepare_forecast_data(rollup)
     
     # Check for sufficient data points
     if len(forecast_df) < 3:
         raise ValueError("Need at least 3 days of historical data for forecasting")
     
-    # Create and fit model
-    model = Prophet(
-        changepoint_prior_scale=0.5,
-        daily_seasonality=False,
-        weekly_seasonality=False,
-        seasonality_mode='additive'
-    )
-    
-    model.fit(forecast_df)
-    
-    # Make forecast
-    future = model.make_future_dataframe(periods=14, freq='D')
-    forecast = model.predict(future)
-    
+    # Refit only when the daily series or the model changes
+    forecast = fit_forecast(forecast_df, engine, FORECAST_PERIODS, FORECAST_ENGINES[engine][1])
+    return build_forecast_figure(forecast_df, forecast)
+
+def create_stored_forecast_chart(rollup, forecast):
+    """Create forecast chart from a batch forecast read from the forecast store"""
+    return build_forecast_figure(prepare_forecast_data(rollup), forecast)
+
+def build_forecast_figure(forecast_df, forecast):
+    """Historical daily prices followed by the forecast and its interval"""
     # Create visualization
     fig = go.Figure()
     
@@ -62,8 +58,8 @@ def create_forecast_chart(df):
     
     # Add forecast
     fig.add_trace(go.Scatter(
-        x=forecast['ds'].tail(14),
-        y=forecast['yhat'].tail(14),
+        x=forecast['ds'],
+        y=forecast['yhat'],
         name='Forecast',
         mode='lines',
         line=dict(dash='dot')
@@ -71,8 +67,8 @@ def create_forecast_chart(df):
     
     # Add confidence interval
     fig.add_trace(go.Scatter(
-        x=forecast['ds'].tail(14),
-        y=forecast['yhat_upper'].tail(14),
+        x=forecast['ds'],
+        y=forecast['yhat_upper'],
         fill=None,
         mode='lines',
         line_color='rgba(0,100,80,0.2)',
@@ -80,8 +76,8 @@ def create_forecast_chart(df):
     ))
     
     fig.add_trace(go.Scatter(
-        x=forecast['ds'].tail(14),
-        y=forecast['yhat_lower'].tail(14),
+        x=forecast['ds'],
+        y=forecast['yhat_lower'],
         fill='tonexty',
         mode='lines',
         line_color='rgba(0,100,80,0.2)',
@@ -98,12 +94,10 @@ def create_forecast_chart(df):
     
     return fig
 
-def create_competitor_chart(df):
+def create_competitor_chart(rollup):
     """Create competitor analysis chart comparing prices and market share"""
     # Calculate average prices per supplier
-    avg_prices = df.groupby(['supplier', 'car_group'])['total_price'].agg([
-        'mean', 'count'
-    ]).reset_index()
+    avg_prices = summarize_rollup(rollup, ['supplier', 'car_group'])
     
     # Create figure with secondary y-axis
     fig = go.Figure()
@@ -115,7 +109,7 @@ def create_competitor_chart(df):
             y=avg_prices['mean'],
             name='Average Price',
             yaxis='y',
-            text=avg_prices['mean'].round(2),
+            text=avg_prices['mean'].astype(float).round(2),
             textposition='auto',
         )
     )
@@ -173,13 +167,9 @@ def create_price_distribution_plot(df):
     
     return fig
 
-def create_daily_price_chart(df):
+def create_daily_price_chart(rollup):
     """Create daily price trend chart"""
-    df['date'] = pd.to_datetime(
-        dict(year=df['year'], month=df['month'], day=df['day'])
-    ).dt.date
-    
-    daily_avg = df.groupby(['date', 'supplier'])['total_price'].mean().reset_index()
+    daily_avg = summarize_rollup(rollup, ['date', 'supplier'])
     
     fig = go.Figure()
     
@@ -187,7 +177,7 @@ def create_daily_price_chart(df):
         supplier_data = daily_avg[daily_avg['supplier'] == supplier]
         fig.add_trace(go.Scatter(
             x=supplier_data['date'],
-            y=supplier_data['total_price'],
+            y=supplier_data['mean'],
             name=supplier,
             mode='lines+markers'
         ))
@@ -201,13 +191,9 @@ def create_daily_price_chart(df):
     
     return fig
 
-def create_pace_chart(df):
+def create_pace_chart(rollup):
     """Create pace view chart showing inventory changes"""
-    df['date'] = pd.to_datetime(
-        dict(year=df['year'], month=df['month'], day=df['day'])
-    ).dt.date
-    
-    daily_counts = df.groupby(['date', 'supplier']).size().reset_index(name='count')
+    daily_counts = summarize_rollup(rollup, ['date', 'supplier'])
     
     fig = go.Figure()
     
@@ -1,31 +1,71 @@
 import streamlit as st
+import threading
 from datetime import datetime, timedelta
-from data_viewer import load_data
-import pandas as pd
+from utils import data_loader, snapshot_cache
+from utils.schema import concat_offers, normalize_offers
+from utils.rollup import build_daily_rollup
+from utils import forecast_store
+
+HISTORICAL_MAX_WORKERS = data_loader.DATE_RANGE_MAX_WORKERS
 
 @st.cache_data(ttl=3600)
-def load_historical_data(days=30):
+def load_historical_data(days=30, max_workers=HISTORICAL_MAX_WORKERS):
     """Load historical market data"""
-    dates_to_fetch = generate_dates_to_fetch(days)
-    data = batch_process_dates(dates_to_fetch)
+    return normalize_offers(get_historical_window().refresh(days, max_workers))
+
+@st.cache_data(ttl=3600)
+def load_daily_rollup(days=30, max_workers=HISTORICAL_MAX_WORKERS):
+    """Daily rollup of the historical window, shared by the Market Analysis tabs"""
+    return build_daily_rollup(load_historical_data(days, max_workers))
+
+@st.cache_data(show_spinner=False)
+def load_forecast_store(version):
+    """Batch forecasts from the local store, reread whenever its version changes"""
+    return forecast_store.read_store()
+
+class HistoricalWindow:
+    """Snapshots already loaded for the rolling window, keyed by search datetime.
+
+    Each entry is (frame, is_final), where is_final records whether the snapshot
+    was already in the past when it was fetched.
+    """
     
-    # Get date range for title
-    if not data.empty:
-        # Convert to integers before creating datetime objects
-        start_datetime = datetime(
-            year=int(data['year'].min()),
-            month=int(data['month'].min()),
-            day=int(data['day'].min()),
-            hour=int(data['hour'].min())
-        )
-        end_datetime = datetime(
-            year=int(data['year'].max()),
-            month=int(data['month'].max()),
-            day=int(data['day'].max()),
-            hour=int(data['hour'].max())
-        )
+    def __init__(self):
+        self.snapshots = {}
+        self.lock = threading.Lock()
     
-    return data
+    def refresh(self, days, max_workers=HISTORICAL_MAX_WORKERS):
+        """Fetch only the dates missing from the window and drop expired ones"""
+        dates_to_fetch = generate_dates_to_fetch(days)
+        
+        with self.lock:
+            for search_datetime in list(self.snapshots):
+                if search_datetime not in dates_to_fetch:
+                    del self.snapshots[search_datetime]
+            
+            # Snapshots fetched while still pending are refetched until they are final
+            missing_dates = [
+                search_datetime for search_datetime in dates_to_fetch
+                if search_datetime not in self.snapshots or not self.snapshots[search_datetime][1]
+            ]
+            if missing_dates:
+                # Finality is taken before fetching so a fetch spanning midnight stays pending
+                is_final = {search_datetime: snapshot_cache.is_cacheable(search_datetime) for search_datetime in missing_dates}
+                for search_datetime, df in batch_process_dates(missing_dates, max_workers).items():
+                    if df.empty:
+                        self.snapshots.pop(search_datetime, None)
+                    else:
+                        self.snapshots[search_datetime] = (df, is_final[search_datetime])
+            
+            return combine_dataframes([
+                self.snapshots[search_datetime][0] for search_datetime in dates_to_fetch
+                if search_datetime in self.snapshots
+            ])
+
+@st.cache_resource
+def get_historical_window():
+    """Process-wide window shared across reruns and sessions"""
+    return HistoricalWindow()
 
 def generate_dates_to_fetch(days):
     """Generate list of dates to fetch data for"""
@@ -39,41 +79,25 @@ def generate_dates_to_fetch(days):
         current_date += timedelta(days=1)
     return dates
 
-def batch_process_dates(dates_to_fetch, batch_size=5):
-    """Process dates in batches"""
+def batch_process_dates(dates_to_fetch, max_workers=HISTORICAL_MAX_WORKERS):
+    """Load the given dates with a progress bar, returning one frame per date"""
     progress_bar = st.progress(0, text="Loading historical market data...")
-    all_dataframes = []
-    
-    for batch_idx in range(0, len(dates_to_fetch), batch_size):
-        batch = dates_to_fetch[batch_idx:batch_idx + batch_size]
-        process_batch(batch, all_dataframes)
-        update_progress(progress_bar, batch_idx, len(dates_to_fetch))
-    
+    snapshots = data_loader.load_date_range(
+        dates_to_fetch,
+        max_workers,
+        on_progress=lambda completed, total: update_progress(progress_bar, completed, total)
+    )
     progress_bar.empty()
-    return combine_dataframes(all_dataframes)
-
-def process_batch(batch_dates, all_dataframes):
-    """Process a batch of dates and append results to all_dataframes"""
-    for search_datetime in batch_dates:
-        try:
-            df = load_data(search_datetime, None, None, False)
-            if not df.empty:
-                all_dataframes.append(df)
-        except Exception as e:
-            # Silently continue if a particular datetime fails
-            continue
+    return snapshots
 
-def update_progress(progress_bar, current_idx, total_items):
+def update_progress(progress_bar, completed, total_items):
     """Update the progress bar"""
-    progress = min((current_idx + 1) / total_items, 1.0)
+    progress = min(completed / total_items, 1.0)
     progress_bar.progress(progress, text="Loading historical market data...")
 
 def combine_dataframes(dataframes):
     """Combine all dataframes and return the result"""
-    if not dataframes:
-        return pd.DataFrame()
-    
-    return pd.concat(dataframes, ignore_index=True)
+    return concat_offers(dataframes)
 
 def select_car_group(df, key=""):
     """Filter dropdown for car groups"""
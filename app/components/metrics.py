@@ -1,7 +1,7 @@
 import pandas as pd
 
 def calculate_market_stats(df):
-    return df.groupby('supplier').agg({
+    return df.groupby('supplier', observed=True).agg({
         'total_price': ['mean', 'min', 'count']
     }).round(2)
 
@@ -10,7 +10,7 @@ def calculate_market_insights(df):
     
     for supplier in df['supplier'].unique():
         supplier_data = df[df['supplier'] == supplier]
-        prices = supplier_data.groupby('date')['total_price'].mean()
+        prices = supplier_data.groupby('snapshot_date')['total_price'].mean()
         
         if len(prices) >= 2:
             insights[supplier] = calculate_supplier_insights(
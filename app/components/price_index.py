@@ -0,0 +1,13 @@
+import streamlit as st
+from .pricing_calculations import PriceRankIndex
+
+def get_price_index(df, fingerprint, sources):
+    """Rank index of the loaded snapshot for a source selection, built once per session"""
+    indexes = st.session_state.setdefault('price_indexes', {})
+    key = (fingerprint, tuple(sorted(sources)))
+    if key not in indexes:
+        # Indexes of a previously loaded snapshot are no longer reachable
+        for stale_key in [k for k in indexes if k[0] != fingerprint]:
+            del indexes[stale_key]
+        indexes[key] = PriceRankIndex(df[df['source'].isin(sources)])
+    return indexes[key]
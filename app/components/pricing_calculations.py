@@ -1,39 +1,188 @@
-def calculate_suggested_price(df, desired_position, handle_ties=False):
-    sorted_prices = df.sort_values('total_price')
-    competitor_data = sorted_prices[['supplier', 'total_price']].copy()
-    
-    green_motion_entries = get_green_motion_entries(competitor_data)
-    
-    if desired_position == 0:
-        return calculate_cheapest_price(competitor_data)
-    
+import numpy as np
+import pandas as pd
+from utils.schema import own_brand_mask
+
+SEGMENT_COLUMNS = ['car_group', 'rental_period']
+
+class PriceRankIndex:
+    """Offers of a snapshot sorted by segment and price, with their ranks precomputed.
+
+    Built once per snapshot and source selection; suggested prices, position
+    checks and what-if queries are then answered from the sorted arrays by
+    indexing and binary search instead of re-sorting the offers. An empty
+    segment_columns list prices the whole frame as a single segment.
+    """
+
+    def __init__(self, df, segment_columns=SEGMENT_COLUMNS):
+        self.segment_columns = list(segment_columns)
+        self.data = pd.DataFrame({
+            **{column: df[column].to_numpy() for column in self.segment_columns},
+            'supplier': df['supplier'].to_numpy(),
+            # Ingest stores prices as float32; widen and round back to pence so
+            # suggested prices and displayed offers match the quoted prices exactly
+            'total_price': df['total_price'].to_numpy(np.float64).round(2),
+            'is_green_motion': get_green_motion_mask(df).to_numpy(),
+            'row_order': np.arange(len(df)),
+        }).sort_values([*self.segment_columns, 'total_price'], kind='stable', ignore_index=True)
+
+        if self.segment_columns:
+            self.segment_ids = self.data.groupby(self.segment_columns, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+        else:
+            self.segment_ids = np.zeros(len(self.data), dtype=np.int64)
+
+        self.ranking = rank_segments(self.data['total_price'].to_numpy(), self.segment_ids)
+        self.segments = self.data.loc[self.ranking['segment_starts'], self.segment_columns].reset_index(drop=True)
+        self.segments['offers'] = self.ranking['segment_sizes']
+        if self.segment_columns:
+            keys = self.segments[self.segment_columns].itertuples(index=False, name=None)
+        else:
+            keys = [()] * len(self.segments)
+        self.segment_lookup = {key: segment_id for segment_id, key in enumerate(keys)}
+
+        # Green Motion offers in sorted order, so each segment's offers are contiguous
+        is_green_motion = self.data['is_green_motion'].to_numpy()
+        self.green_motion_segments = self.segment_ids[is_green_motion]
+        self.green_motion_positions = self.ranking['positions'][is_green_motion]
+        self.green_motion_dense_ranks = self.ranking['dense_ranks'][is_green_motion]
+        green_motion = self.data.loc[is_green_motion, ['row_order', 'total_price']].assign(segment_id=self.green_motion_segments)
+        self.green_motion_prices = green_motion.sort_values('row_order').groupby('segment_id')['total_price'].first()
+
+    def suggested_prices(self, desired_position, handle_ties=False):
+        """Suggested price for every segment at one desired position.
+
+        Returns one row per segment with the segment columns plus offers,
+        suggested_price, is_correct_position and green_motion_price (the first
+        Green Motion offer in input order).
+        """
+        return self.position_sweep([desired_position], handle_ties).drop(columns='desired_position')
+
+    def position_sweep(self, desired_positions, handle_ties=False):
+        """Suggested prices for every segment at several desired positions in one pass.
+
+        Returns one row per segment and position, with a desired_position
+        column after the segment columns.
+        """
+        desired_positions = np.asarray(desired_positions)
+        prices = sweep_prices(self.ranking, desired_positions, handle_ties)
+
+        # Green Motion is in position when any of its offers ranks at desired_position or the next one
+        ranks = (self.green_motion_dense_ranks if handle_ties else self.green_motion_positions)[:, None]
+        in_position = (ranks == desired_positions) | (ranks == desired_positions + 1)
+        is_correct_position = np.zeros(prices.shape, dtype=bool)
+        np.logical_or.at(is_correct_position, self.green_motion_segments, in_position)
+
+        sweep = self.segments.loc[self.segments.index.repeat(len(desired_positions))].reset_index(drop=True)
+        sweep.insert(len(self.segment_columns), 'desired_position', np.tile(desired_positions, len(self.segments)))
+        sweep['suggested_price'] = prices.ravel()
+        sweep['is_correct_position'] = is_correct_position.ravel()
+        green_motion_prices = self.green_motion_prices.reindex(self.segments.index).to_numpy()
+        sweep['green_motion_price'] = green_motion_prices.repeat(len(desired_positions))
+        return sweep
+
+    def segment_id(self, key):
+        return self.segment_lookup.get(tuple(key))
+
+    def segment_offers(self, key):
+        """Supplier and price of a segment's offers, cheapest first, or None"""
+        segment_id = self.segment_id(key)
+        if segment_id is None:
+            return None
+        start = self.ranking['segment_starts'][segment_id]
+        end = start + self.ranking['segment_sizes'][segment_id]
+        return self.data.iloc[start:end][['supplier', 'total_price', 'is_green_motion']]
+
+    def ranked_prices(self, key, handle_ties=False):
+        """A segment's prices by position: every offer, or each distinct price once"""
+        segment_id = self.segment_id(key)
+        if segment_id is None:
+            return self.ranking['prices'][:0]
+        if handle_ties:
+            start = self.ranking['unique_starts'][segment_id]
+            return self.ranking['unique_prices'][start:start + self.ranking['unique_counts'][segment_id]]
+        start = self.ranking['segment_starts'][segment_id]
+        return self.ranking['prices'][start:start + self.ranking['segment_sizes'][segment_id]]
+
+    def price_for_position(self, key, desired_position, handle_ties=False):
+        """Suggested price for one segment, by the same rules as sweep_prices"""
+        prices = self.ranked_prices(key, handle_ties)
+        if len(prices) == 0:
+            return None
+        if desired_position == 0:
+            return prices[0] * 0.95
+        if len(prices) <= desired_position + 1:
+            return prices[-1] * 1.05
+        return (prices[desired_position] + prices[desired_position + 1]) / 2
+
+    def rank_of_price(self, key, price, handle_ties=False):
+        """0-based position a new offer at price would take in a segment"""
+        return int(np.searchsorted(self.ranked_prices(key, handle_ties), price, side='left'))
+
+    def green_motion_ranks(self, key, handle_ties=False):
+        """Positions (or dense ranks) of a segment's Green Motion offers, cheapest first"""
+        segment_id = self.segment_id(key)
+        if segment_id is None:
+            return self.green_motion_positions[:0]
+        start, end = np.searchsorted(self.green_motion_segments, [segment_id, segment_id + 1])
+        ranks = self.green_motion_dense_ranks if handle_ties else self.green_motion_positions
+        return ranks[start:end]
+
+    def is_correct_position(self, key, desired_position, handle_ties=False):
+        ranks = self.green_motion_ranks(key, handle_ties)
+        return bool(np.isin([desired_position, desired_position + 1], ranks).any())
+
+def get_green_motion_mask(df):
+    """The is_green_motion column added at ingest, or the same match for frames without it"""
+    if 'is_green_motion' in df:
+        return df['is_green_motion']
+    return own_brand_mask(df['supplier'])
+
+def rank_segments(prices, segment_ids):
+    """Sequential positions and dense price ranks for prices sorted within consecutive segments"""
+    is_segment_start = np.diff(segment_ids, prepend=-1) != 0
+    segment_starts = np.flatnonzero(is_segment_start)
+    segment_sizes = np.diff(np.r_[segment_starts, len(prices)])
+
+    is_new_price = is_segment_start | (np.diff(prices, prepend=np.nan) != 0)
+    dense_global = np.cumsum(is_new_price) - 1
+    unique_starts = dense_global[segment_starts]
+    unique_prices = prices[is_new_price]
+
+    return {
+        'prices': prices,
+        'segment_starts': segment_starts,
+        'segment_sizes': segment_sizes,
+        'positions': np.arange(len(prices)) - segment_starts[segment_ids],
+        'unique_prices': unique_prices,
+        'unique_starts': unique_starts,
+        'unique_counts': np.diff(np.r_[unique_starts, len(unique_prices)]),
+        'dense_ranks': dense_global - unique_starts[segment_ids],
+        'segment_min': prices[segment_starts],
+        'segment_max': prices[segment_starts + segment_sizes - 1],
+    }
+
+def sweep_prices(ranking, desired_positions, handle_ties):
+    """Midpoint between the prices at each desired position and the next one in every segment.
+
+    Returns one column per position. Cheapest minus 5% for position 0 and the
+    most expensive plus 5% when a segment is too small; negative positions wrap
+    around like list indexing.
+    """
+    desired_positions = np.asarray(desired_positions)
     if handle_ties:
-        return calculate_with_ties(competitor_data, green_motion_entries, desired_position)
-    
-    return calculate_sequential(competitor_data, green_motion_entries, desired_position)
-
-def get_green_motion_entries(competitor_data):
-    return competitor_data[
-        competitor_data['supplier'].str.contains('GREEN MOTION', case=False, na=False)
-    ]
-
-def calculate_cheapest_price(competitor_data):
-    return competitor_data.iloc[0]['total_price'] * 0.95
-
-def calculate_with_ties(competitor_data, green_motion_entries, desired_position):
-    unique_prices = sorted(competitor_data['total_price'].unique())
-    
-    if len(unique_prices) <= desired_position + 1:
-        return competitor_data['total_price'].max() * 1.05
-        
-    price_at_position = unique_prices[desired_position]
-    price_at_next = unique_prices[desired_position + 1]
-    return (price_at_position + price_at_next) / 2
-
-def calculate_sequential(competitor_data, green_motion_entries, desired_position):
-    if len(competitor_data) <= desired_position + 1:
-        return competitor_data['total_price'].max() * 1.05
-        
-    price_at_position = competitor_data.iloc[desired_position]['total_price']
-    price_at_next = competitor_data.iloc[desired_position + 1]['total_price']
-    return (price_at_position + price_at_next) / 2
+        ranked_prices, starts, counts = ranking['unique_prices'], ranking['unique_starts'], ranking['unique_counts']
+    else:
+        ranked_prices, starts, counts = ranking['prices'], ranking['segment_starts'], ranking['segment_sizes']
+    starts, counts = starts[:, None], counts[:, None]
+
+    has_enough = counts > desired_positions + 1
+    at_position = np.where(has_enough, starts + wrap_position(desired_positions, counts), starts)
+    at_next = np.where(has_enough, starts + wrap_position(desired_positions + 1, counts), starts)
+    prices = np.where(
+        has_enough,
+        (ranked_prices[at_position] + ranked_prices[at_next]) / 2,
+        ranking['segment_max'][:, None] * 1.05
+    )
+    return np.where(desired_positions == 0, ranking['segment_min'][:, None] * 0.95, prices)
+
+def wrap_position(position, counts):
+    return np.where(position < 0, counts + position, position)
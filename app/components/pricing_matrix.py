@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from .pricing_calculations import calculate_suggested_price
+from .price_index import get_price_index
+from .pricing_calculations import SEGMENT_COLUMNS
 
-def render_matrix_view(df):
+MATRIX_CACHE_SIZE = 64
+
+def render_matrix_view(df, fingerprint):
     # Data source filter in its own row
     sources = sorted(df['source'].unique())
     selected_sources = st.multiselect(
@@ -39,16 +43,16 @@ def render_matrix_view(df):
             key="matrix_handle_ties"
         )
     
-    # Filter data by sources
-    filtered_df = df[df['source'].isin(selected_sources)]
+    # Rank index of the selected sources, reused across position and tie changes
+    price_index = get_price_index(df, fingerprint, selected_sources)
     
     # Create and display matrix
-    matrix_df, cell_colors = build_matrix_data(filtered_df, 
-                                             sorted(filtered_df['car_group'].unique()),
-                                             sorted(filtered_df['rental_period'].unique()),
+    matrix_df, in_position = get_matrix_data(fingerprint,
+                                             tuple(sorted(selected_sources)),
                                              desired_position,  # Pass the adjusted position
-                                             handle_ties)
-    display_matrix(matrix_df, cell_colors)
+                                             handle_ties,
+                                             price_index)
+    display_matrix(matrix_df, in_position)
     add_export_button(matrix_df)
 
 def add_export_button(matrix_df):
@@ -64,72 +68,47 @@ def add_export_button(matrix_df):
             mime="text/csv"
         )
 
-def display_matrix(matrix_df, cell_colors):
-    def style_df(df):
-        styles = pd.DataFrame('', index=df.index, columns=df.columns)
-        for i in range(len(df)):
-            for j in range(len(df.columns)):
-                if cell_colors[i][j] == 'lightgreen':
-                    styles.iloc[i, j] = 'background-color: lightgreen'
-        return styles
-
+def display_matrix(matrix_df, in_position):
+    styles = np.where(in_position, 'background-color: lightgreen', '')
     styler = matrix_df.style.set_table_attributes('style="width: 100%;"')\
-                           .apply(style_df, axis=None)
+                           .apply(lambda df: styles, axis=None)
     
     st.dataframe(styler, use_container_width=True)
 
-def build_matrix_data(filtered_df, car_groups, rental_periods, desired_position, handle_ties):
-    matrix_data = []
-    cell_colors = []
+@st.cache_data(max_entries=MATRIX_CACHE_SIZE, show_spinner=False)
+def get_matrix_data(fingerprint, sources, desired_position, handle_ties, _price_index):
+    """build_matrix_data memoized on snapshot, sources, position and tie handling, evicted LRU"""
+    return build_matrix_data(_price_index,
+                             sorted(_price_index.segments['car_group'].unique()),
+                             sorted(_price_index.segments['rental_period'].unique()),
+                             desired_position,
+                             handle_ties)
+
+def build_matrix_data(price_index, car_groups, rental_periods, desired_position, handle_ties):
+    segments = price_index.suggested_prices(desired_position, handle_ties)
+    return format_matrix(segments, car_groups, rental_periods)
+
+def format_matrix(segments, car_groups, rental_periods):
+    """Car group by rental period grid of suggested (or in-position Green Motion) prices.
+
+    Returns the grid and a boolean mask, shaped like the grid, of the cells
+    where Green Motion is already in position.
+    """
+    grid = pd.MultiIndex.from_product([car_groups, rental_periods], names=SEGMENT_COLUMNS)
+    cells = segments.set_index(SEGMENT_COLUMNS).reindex(grid)
+    shape = (len(car_groups), len(rental_periods))
     
-    for car_group in car_groups:
-        row_data = {'Car Group': car_group}
-        row_colors = ['white'] * (len(rental_periods) + 1)
-        
-        for i, period in enumerate(rental_periods, 1):
-            period_data = filtered_df[
-                (filtered_df['car_group'] == car_group) & 
-                (filtered_df['rental_period'] == period)
-            ]
-            if not period_data.empty:
-                # Get Green Motion entries
-                green_motion_entries = period_data[
-                    period_data['supplier'].str.contains('GREEN MOTION', case=False, na=False)
-                ]
-                
-                # Check if Green Motion is in correct position
-                is_correct_position = False
-                sorted_data = period_data.sort_values('total_price')
-                
-                if not green_motion_entries.empty:
-                    if handle_ties:
-                        unique_prices = sorted(sorted_data['total_price'].unique())
-                        price_to_rank = {price: idx for idx, price in enumerate(unique_prices)}
-                        green_motion_ranks = green_motion_entries['total_price'].map(price_to_rank)
-                        is_correct_position = any(rank in [desired_position, desired_position + 1] 
-                                               for rank in green_motion_ranks)
-                    else:
-                        green_motion_indices = sorted_data[
-                            sorted_data['supplier'].str.contains('GREEN MOTION', case=False, na=False)
-                        ].index
-                        green_motion_ranks = [sorted_data.index.get_loc(idx) 
-                                           for idx in green_motion_indices]
-                        is_correct_position = any(rank in [desired_position, desired_position + 1] 
-                                               for rank in green_motion_ranks)
-                
-                if is_correct_position:
-                    # Show the actual Green Motion price when in correct position
-                    green_motion_price = green_motion_entries['total_price'].iloc[0]
-                    row_colors[i] = 'lightgreen'
-                    row_data[f'{period} Days'] = f"✅ £{green_motion_price:.2f}"
-                else:
-                    # Show suggested price when not in correct position
-                    suggested_price = calculate_suggested_price(period_data, desired_position, handle_ties)
-                    row_data[f'{period} Days'] = f"£{suggested_price:.2f}"
-            else:
-                row_data[f'{period} Days'] = "N/A"
-                
-        matrix_data.append(row_data)
-        cell_colors.append(row_colors)
+    has_offers = cells['offers'].notna().to_numpy()
+    in_position = cells['is_correct_position'].eq(True).to_numpy()
+    # Show the actual Green Motion price when in correct position, the suggested price otherwise.
+    # astype(str) keeps the labels strings when no sources are selected and the grid is empty
+    labels = np.where(
+        in_position,
+        '✅ £' + cells['green_motion_price'].map('{:.2f}'.format).astype(str),
+        np.where(has_offers, '£' + cells['suggested_price'].map('{:.2f}'.format).astype(str), 'N/A')
+    )
     
-    return pd.DataFrame(matrix_data), cell_colors
\ No newline at end of file
+    matrix_df = pd.DataFrame(labels.reshape(shape), columns=[f'{period} Days' for period in rental_periods])
+    matrix_df.insert(0, 'Car Group', car_groups)
+    in_position_mask = np.column_stack([np.zeros(shape[0], dtype=bool), in_position.reshape(shape)])
+    return matrix_df, in_position_mask
@@ -0,0 +1,71 @@
+import streamlit as st
+import numpy as np
+from datetime import datetime
+from .price_index import get_price_index
+from .pricing_matrix import display_matrix, format_matrix
+
+MAX_SWEEP_POSITION = 20
+
+def render_sweep_view(df, fingerprint):
+    sources = sorted(df['source'].unique())
+    selected_sources = st.multiselect(
+        "Select Data Sources",
+        options=sources,
+        default=sources,
+        key="sweep_pricing_sources"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        max_position = st.number_input(
+            "Compare Market Positions 1 to",
+            min_value=1,
+            max_value=MAX_SWEEP_POSITION,
+            value=6,
+            key="sweep_max_position"
+        )
+    
+    with col2:
+        handle_ties = st.checkbox(
+            "Group same prices together",
+            value=False,
+            help="When enabled, vehicles with the same price will share the same position",
+            key="sweep_handle_ties"
+        )
+    
+    price_index = get_price_index(df, fingerprint, selected_sources)
+    display_positions = np.arange(1, max_position + 1)
+    # Positions are offset as in the Matrix View, so each tab matches the matrix for that position
+    sweep = price_index.position_sweep(display_positions - 2, handle_ties)
+    sweep['desired_position'] += 2
+    
+    car_groups = sorted(price_index.segments['car_group'].unique())
+    rental_periods = sorted(price_index.segments['rental_period'].unique())
+    tabs = st.tabs([f"Position {position}" for position in display_positions])
+    for position, tab in zip(display_positions, tabs):
+        with tab:
+            matrix_df, in_position = format_matrix(
+                sweep[sweep['desired_position'] == position], car_groups, rental_periods
+            )
+            display_matrix(matrix_df, in_position)
+    
+    add_sweep_export_button(sweep)
+
+def add_sweep_export_button(sweep):
+    export_df = sweep.rename(columns={
+        'car_group': 'Car Group',
+        'rental_period': 'Rental Period',
+        'desired_position': 'Position',
+        'offers': 'Offers',
+        'suggested_price': 'Suggested Price',
+        'is_correct_position': 'Green Motion In Position',
+        'green_motion_price': 'Green Motion Price',
+    })
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    st.download_button(
+        label="Export Sweep to CSV",
+        data=export_df.to_csv(index=False, float_format='%.2f').encode('utf-8'),
+        file_name=f"pricing_sweep_{timestamp}.csv",
+        mime="text/csv"
+    )
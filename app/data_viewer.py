@@ -1,8 +1,7 @@
-import pandas as pd
 import display_data
 import streamlit as st
 from datetime import datetime
-import api.utils as api_utils
+from utils import data_loader
 from aws_utils import logs, iam
 import os
 import re
@@ -54,68 +53,10 @@ def select_time(restricted_times=True, key_suffix="", timezone="UTC"):
     return str(search_time.split(":")[0])
 
 
-def convert_json_to_df(json_data):
-    return pd.DataFrame(json_data)
-
-
 def load_data(search_datetime, pickup_datetime, dropoff_datetime, is_custom_search):
-    site_names = ["do_you_spain", "rental_cars", "holiday_autos"]
-    dataframes = []
-
-    for site_name in site_names:
-        if is_custom_search:
-            formatted_pickup = (
-                pickup_datetime.replace(" ", "T")
-                if " " in pickup_datetime
-                else pickup_datetime
-            )
-            formatted_dropoff = (
-                dropoff_datetime.replace(" ", "T")
-                if " " in dropoff_datetime
-                else dropoff_datetime
-            )
-
-            api_url = f"/items/?table_name={site_name}&pickup_datetime={formatted_pickup}&dropoff_datetime={formatted_dropoff}&limit=10000"
-            json_data = api_utils.get_request(api_url)
-
-            if json_data:
-                # Convert rental_period to numeric if it's 'custom'
-                for item in json_data:
-                    if item.get("rental_period") == "custom":
-                        # Calculate rental period from pickup and dropoff dates
-                        pickup = datetime.strptime(
-                            item["pickup_datetime"], "%Y-%m-%dT%H:%M:%S"
-                        )
-                        dropoff = datetime.strptime(
-                            item["dropoff_datetime"], "%Y-%m-%dT%H:%M:%S"
-                        )
-                        item["rental_period"] = (dropoff - pickup).days
-
-                df = convert_json_to_df(json_data)
-                if not df.empty:
-                    # Ensure rental_period is numeric
-                    df["rental_period"] = pd.to_numeric(
-                        df["rental_period"], errors="coerce"
-                    )
-                    dataframes.append(df)
-        else:
-            formatted_search = (
-                search_datetime.replace(" ", "T")
-                if " " in search_datetime
-                else search_datetime
-            )
-            api_url = f"/items/?table_name={site_name}&search_datetime={formatted_search}:00&limit=10000"
-            json_data = api_utils.get_request(api_url)
-
-            if json_data:
-                df = convert_json_to_df(json_data)
-                if not df.empty:
-                    dataframes.append(df)
-
-    if dataframes:
-        final_df = pd.concat(dataframes, ignore_index=True)
-        return final_df
-    return pd.DataFrame()
+    if is_custom_search:
+        return data_loader.load_custom_search(pickup_datetime, dropoff_datetime)
+    return data_loader.load_snapshot(search_datetime)
 
 
 def load_data_and_display(
@@ -109,8 +109,9 @@ def display_results(df, rental_period, selected_car_group, num_vehicles):
         if selected_car_group == "All":
             # Get top n vehicles per car group
             top_vehicles = (
-                display_df.groupby("car_group")
-                .apply(lambda x: x.nsmallest(n_vehicles, "total_price"))
+                display_df.sort_values("total_price", kind="stable")
+                .groupby("car_group", observed=True)
+                .head(n_vehicles)
                 .reset_index(drop=True)
             )
         else:
@@ -142,7 +143,7 @@ def display_results(df, rental_period, selected_car_group, num_vehicles):
 
 def display_average_price_chart(df, rental_period):
     avg_prices = (
-        df.groupby(["car_group", "supplier"])["total_price"].mean().reset_index()
+        df.groupby(["car_group", "supplier"], observed=True)["total_price"].mean().reset_index()
     )
 
     fig = go.Figure()
@@ -153,7 +154,7 @@ def display_average_price_chart(df, rental_period):
                 x=group_data["supplier"],
                 y=group_data["total_price"],
                 name=car_group,
-                text=group_data["total_price"].round(2),
+                text=group_data["total_price"].astype(float).round(2),
                 textposition="auto",
             )
         )
@@ -172,7 +173,7 @@ def display_average_price_chart(df, rental_period):
 
 
 def remove_internal_columns(df):
-    return df.drop(columns=["day", "month", "year", "hour"], errors="ignore")
+    return df.drop(columns=["day", "month", "year", "hour", "is_green_motion", "snapshot_date", "snapshot_datetime"], errors="ignore")
 
 
 def download_filtered_data(filtered_df):
@@ -1,5 +1,4 @@
 import streamlit as st
-from datetime import datetime
 from aws_utils import iam
 import display_data
 from analysis import (
@@ -9,7 +8,7 @@ from analysis import (
     future_trends,
     competitor_analysis
 )
-from components.filters import load_historical_data
+from components.filters import load_daily_rollup, load_historical_data
 
 def main():
     st.title("Market Analysis Dashboard")
@@ -20,24 +19,15 @@ def main():
     # Load data
     with st.spinner("Loading market data..."):
         df = load_historical_data()
+        rollup = load_daily_rollup()
     
     if df.empty:
         st.error("No data available for analysis")
         return
         
     # Get date range from data
-    start_datetime = datetime(
-        year=int(df['year'].min()),
-        month=int(df['month'].min()),
-        day=int(df['day'].min()),
-        hour=int(df['hour'].min())
-    )
-    end_datetime = datetime(
-        year=int(df['year'].max()),
-        month=int(df['month'].max()),
-        day=int(df['day'].max()),
-        hour=int(df['hour'].max())
-    )
+    start_datetime = df['snapshot_datetime'].min()
+    end_datetime = df['snapshot_datetime'].max()
     
     # Display data availability with market analysis parameters
     display_data.display_data_availability(
@@ -69,7 +59,7 @@ def main():
     
     for tab, func in zip(tabs, tab_functions):
         with tab:
-            func(df)
+            func(df, rollup)
 
 if __name__ == "__main__":
     main()
@@ -6,30 +6,30 @@ from aws_utils import iam
 from components.pricing_filters import render_filters
 from components.pricing_table import create_pricing_table
 from components.pricing_matrix import render_matrix_view
-from utils.data_loader import load_latest_data
+from components.pricing_sweep import render_sweep_view
+from components.price_index import get_price_index
+from utils.data_loader import load_snapshot, snapshot_fingerprint
 from components.date_selector import select_date, select_time
 
-def render_pricing_strategy(df):
-    tab1, tab2 = st.tabs(["Detailed View", "Matrix View"])
+def render_pricing_strategy(df, fingerprint):
+    tab1, tab2, tab3 = st.tabs(["Detailed View", "Matrix View", "Position Sweep"])
     
     with tab1:
-        render_detailed_view(df)
+        render_detailed_view(df, fingerprint)
     
     with tab2:
-        render_matrix_view(df)
+        render_matrix_view(df, fingerprint)
+    
+    with tab3:
+        render_sweep_view(df, fingerprint)
 
-def render_detailed_view(df):
+def render_detailed_view(df, fingerprint):
     # Get filter values
     rental_period, selected_car_group, selected_sources, desired_position, handle_ties = render_filters(df)
     
-    # Filter data
-    filtered_df = df[
-        (df['rental_period'] == rental_period) &
-        (df['source'].isin(selected_sources)) &
-        (df['car_group'] == selected_car_group)
-    ]
-    
-    create_pricing_table(filtered_df, desired_position - 1, handle_ties)
+    # The index is built once per snapshot and source selection, so position changes only read it
+    price_index = get_price_index(df, fingerprint, selected_sources)
+    create_pricing_table(price_index, (selected_car_group, rental_period), desired_position - 1, handle_ties)
 
 def main():
     st.title("Pricing Strategy")
@@ -50,18 +50,19 @@ def main():
     # Load data button
     if st.button("Load data"):
         with st.spinner("Loading market data..."):
-            df = load_latest_data(search_datetime)
+            df = load_snapshot(search_datetime)
         
         if df.empty:
             st.error("No data available for analysis")
             return
             
         st.session_state.pricing_df = df
+        st.session_state.pricing_fingerprint = snapshot_fingerprint(df)
         st.session_state.data_loaded = True
     
     # Only show pricing strategy when data is loaded
     if 'data_loaded' in st.session_state and st.session_state.data_loaded:
-        render_pricing_strategy(st.session_state.pricing_df)
+        render_pricing_strategy(st.session_state.pricing_df, st.session_state.pricing_fingerprint)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,20 +1,65 @@
+import hashlib
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
+import streamlit as st
 import api.utils as api_utils
+from utils import snapshot_cache
+from utils.schema import concat_offers, derive_custom_rental_periods, normalize_offers
 
+SITE_NAMES = ["do_you_spain", "rental_cars", "holiday_autos"]
+DATE_RANGE_MAX_WORKERS = 8
+SNAPSHOT_MEMO_MAX_BYTES = int(os.environ.get("SNAPSHOT_MEMO_MAX_BYTES", 512 * 1024 * 1024))
+PENDING_SNAPSHOT_TTL = 300
 
-def load_latest_data(search_datetime):
-    site_names = ["do_you_spain", "rental_cars", "holiday_autos"]
-    dataframes = []
 
-    for site_name in site_names:
-        formatted_search = format_search_datetime(search_datetime)
-        json_data = fetch_data(site_name, formatted_search)
-        if json_data:
-            df = process_data(json_data, site_name)
-            if not df.empty:
-                dataframes.append(df)
+class SnapshotMemo:
+    """In-process LRU of normalised per-site snapshot frames shared by every page.
 
-    return pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame()
+    Bounded by the frames' in-memory size. Final snapshots are kept until
+    evicted; today's pending snapshots expire after PENDING_SNAPSHOT_TTL seconds
+    so new scrapes are picked up.
+    """
+
+    def __init__(self, max_bytes=SNAPSHOT_MEMO_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, df, size = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.entries[key]
+                self.total_bytes -= size
+                return None
+            self.entries.move_to_end(key)
+            return df
+
+    def put(self, key, df, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = int(df.memory_usage(deep=True).sum())
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[2]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (expires_at, df, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+
+snapshot_memo = SnapshotMemo()
 
 
 def format_search_datetime(search_datetime):
@@ -23,12 +68,149 @@ def format_search_datetime(search_datetime):
     )
 
 
-def fetch_data(site_name, formatted_search):
-    api_url = f"/items/?table_name={site_name}&search_datetime={formatted_search}:00&limit=10000"
-    return api_utils.get_request(api_url)
+def snapshot_fingerprint(df):
+    """Content hash of a loaded frame, used to key work derived from it"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
 
 
-def process_data(json_data, site_name):
-    df = pd.DataFrame(json_data)
+def fetch_data(api_url, site_name):
+    df = api_utils.get_paginated_frame(api_url)
+    if df.empty:
+        return df
+    return process_data(df, site_name)
+
+
+def process_data(df, site_name):
     df["source"] = site_name
     return df
+
+
+def fetch_site_snapshot(site_name, search_datetime):
+    """Normalised frame for one site's scheduled search, via the memo and disk cache"""
+    formatted_search = format_search_datetime(search_datetime)
+    key = (site_name, formatted_search)
+
+    df = snapshot_memo.get(key)
+    if df is not None:
+        return df
+
+    api_url = f"/items/?table_name={site_name}&search_datetime={formatted_search}:00"
+    df = normalize_offers(
+        snapshot_cache.get_or_fetch(
+            site_name, formatted_search, lambda: fetch_data(api_url, site_name)
+        )
+    )
+
+    # Like the disk cache, never memoise an empty result (it may be a scrape in
+    # progress) or a truncated one
+    if not df.empty and not df.attrs.get("truncated"):
+        is_final = snapshot_cache.is_cacheable(formatted_search)
+        snapshot_memo.put(key, df, ttl=None if is_final else PENDING_SNAPSHOT_TTL)
+    return df
+
+
+def fetch_site_custom_search(site_name, pickup_datetime, dropoff_datetime):
+    formatted_pickup = format_search_datetime(pickup_datetime)
+    formatted_dropoff = format_search_datetime(dropoff_datetime)
+    api_url = f"/items/?table_name={site_name}&pickup_datetime={formatted_pickup}&dropoff_datetime={formatted_dropoff}"
+    return derive_custom_rental_periods(fetch_data(api_url, site_name))
+
+
+def run_tasks(tasks, fetch, max_workers, on_progress=None):
+    """Run fetch(*task) for every task on a bounded pool.
+
+    Returns ({task: frame}, {task: exception}); on_progress(completed, total)
+    is called from the calling thread as each future finishes.
+    """
+    results = {}
+    failures = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, *task): task for task in tasks}
+        for completed, future in enumerate(as_completed(futures), 1):
+            task = futures[future]
+            try:
+                results[task] = future.result()
+            except Exception as e:
+                failures[task] = e
+            if on_progress:
+                on_progress(completed, len(tasks))
+
+    return results, failures
+
+
+def combine_site_frames(site_dataframes):
+    """Concatenate per-site frames in site order and normalise the result"""
+    dataframes = [
+        site_dataframes[site_name]
+        for site_name in SITE_NAMES
+        if site_name in site_dataframes and not site_dataframes[site_name].empty
+    ]
+    if not dataframes:
+        return pd.DataFrame()
+    return normalize_offers(concat_offers(dataframes))
+
+
+def report_failed_sites(failed_sites):
+    for site_name, error in failed_sites.items():
+        st.warning(f"Failed to load data from {site_name}: {error}")
+
+
+def report_truncated_sites(site_dataframes):
+    for site_name, df in site_dataframes.items():
+        if df.attrs.get("truncated"):
+            st.warning(f"Results from {site_name} were truncated at {len(df)} rows")
+
+
+def load_sites(fetch, *args):
+    """Fetch every site concurrently and combine the results in site order"""
+    results, failures = run_tasks(
+        [(site_name, *args) for site_name in SITE_NAMES], fetch, len(SITE_NAMES)
+    )
+    site_dataframes = {task[0]: df for task, df in results.items()}
+
+    report_failed_sites({task[0]: error for task, error in failures.items()})
+    report_truncated_sites(site_dataframes)
+    return combine_site_frames(site_dataframes)
+
+
+def load_snapshot(search_datetime):
+    """All sites for one scheduled search datetime"""
+    return load_sites(fetch_site_snapshot, search_datetime)
+
+
+def load_custom_search(pickup_datetime, dropoff_datetime):
+    """All sites for one custom pickup/dropoff search"""
+    return load_sites(fetch_site_custom_search, pickup_datetime, dropoff_datetime)
+
+
+def load_date_range(
+    search_datetimes, max_workers=DATE_RANGE_MAX_WORKERS, on_progress=None
+):
+    """Scheduled snapshots for many datetimes, fetched across (date, site) pairs.
+
+    Returns {search_datetime: normalised combined frame}; datetimes with a
+    failed site are left out so callers can retry them.
+    """
+    tasks = [
+        (site_name, search_datetime)
+        for search_datetime in search_datetimes
+        for site_name in SITE_NAMES
+    ]
+    results, failures = run_tasks(tasks, fetch_site_snapshot, max_workers, on_progress)
+
+    if failures:
+        st.warning(
+            f"Could not load {len(failures)} of {len(tasks)} historical snapshots"
+        )
+
+    failed_datetimes = {search_datetime for _, search_datetime in failures}
+    snapshots = {}
+    for search_datetime in search_datetimes:
+        if search_datetime in failed_datetimes:
+            continue
+        snapshots[search_datetime] = combine_site_frames(
+            {site_name: results[(site_name, search_datetime)] for site_name in SITE_NAMES}
+        )
+    return snapshots
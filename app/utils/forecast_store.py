@@ -0,0 +1,129 @@
+"""Batch forecasts for every (car_group, rental_period) series, kept in a local Parquet store.
+
+Run from the app directory, e.g. nightly after the day's snapshots land:
+
+    python -m utils.forecast_store
+    FORECAST_ENGINE=holt python -m utils.forecast_store
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import pandas as pd
+from utils.forecasting import DEFAULT_FORECAST_ENGINE, MIN_FORECAST_POINTS, run_forecast, to_forecast_frame
+from utils.parquet_io import write_parquet_atomic
+from utils.rollup import summarize_rollup
+
+FORECAST_STORE_PATH = os.environ.get(
+    "FORECAST_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "greenmotion", "forecasts", "forecasts.parquet"),
+)
+FORECAST_MAX_WORKERS = int(os.environ.get("FORECAST_MAX_WORKERS", os.cpu_count() or 1))
+SEGMENT_COLUMNS = ["car_group", "rental_period"]
+
+
+def segment_series(rollup):
+    """(segment key, ds/y frame) for every segment with enough daily history"""
+    daily = summarize_rollup(rollup, [*SEGMENT_COLUMNS, "date"])
+    for key, segment_daily in daily.groupby(SEGMENT_COLUMNS, observed=True):
+        forecast_df = to_forecast_frame(segment_daily)
+        if len(forecast_df) >= MIN_FORECAST_POINTS:
+            yield key, forecast_df
+
+
+def forecast_segment(task):
+    """Runs in a worker process; a failed fit is reported instead of stopping the batch"""
+    (car_group, rental_period), forecast_df, engine = task
+    try:
+        forecast = run_forecast(forecast_df, engine)
+    except Exception:
+        return (car_group, rental_period), None
+
+    return (car_group, rental_period), forecast.assign(
+        car_group=car_group,
+        rental_period=rental_period,
+        engine=engine,
+        history_end=forecast_df["ds"].max(),
+    )
+
+
+def run_batch_forecast(rollup, engine=DEFAULT_FORECAST_ENGINE, max_workers=FORECAST_MAX_WORKERS, path=FORECAST_STORE_PATH):
+    """Fit every segment with one engine across a process pool and replace its forecasts in the store.
+
+    Returns the engine's stored forecasts and the segment keys whose fit failed.
+    """
+    tasks = [(key, forecast_df, engine) for key, forecast_df in segment_series(rollup)]
+    if not tasks:
+        return pd.DataFrame(), []
+
+    # Spawned workers avoid forking the threads of a running Streamlit server
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), mp_context=context) as executor:
+        results = list(executor.map(forecast_segment, tasks, chunksize=max(len(tasks) // (max_workers * 4), 1)))
+
+    failed = [key for key, forecast in results if forecast is None]
+    forecasts = [forecast for _, forecast in results if forecast is not None]
+    if not forecasts:
+        return pd.DataFrame(), failed
+
+    store = pd.concat(forecasts, ignore_index=True)
+    store["generated_at"] = pd.Timestamp(datetime.now())
+
+    # Forecasts from other engines stay in the store
+    previous = read_store(path)
+    if previous is not None and "engine" in previous:
+        store = pd.concat([previous[previous["engine"] != engine], store], ignore_index=True)
+    write_store(store, path)
+    return store[store["engine"] == engine], failed
+
+
+def write_store(store, path=FORECAST_STORE_PATH):
+    # Readers keep seeing the previous forecasts until the new file is complete
+    write_parquet_atomic(store, path)
+
+
+def read_store(path=FORECAST_STORE_PATH):
+    """The stored forecasts, or None when no batch has run or the file is unreadable"""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+
+def store_version(path=FORECAST_STORE_PATH):
+    """Changes whenever a batch replaces the store, for keying caches of its contents"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def stored_forecast(store, car_group, rental_period, engine=DEFAULT_FORECAST_ENGINE):
+    """Forecast rows of one segment from the store, or None"""
+    if store is None or store.empty or "engine" not in store:
+        return None
+
+    segment = store[
+        (store["car_group"] == car_group)
+        & (store["rental_period"] == rental_period)
+        & (store["engine"] == engine)
+    ]
+    return segment.reset_index(drop=True) if not segment.empty else None
+
+
+def main():
+    from components.filters import load_historical_data
+    from utils.rollup import build_daily_rollup
+
+    store, failed = run_batch_forecast(build_daily_rollup(load_historical_data()))
+    segments = store[SEGMENT_COLUMNS].drop_duplicates() if not store.empty else store
+    print(f"Stored {DEFAULT_FORECAST_ENGINE} forecasts for {len(segments)} segments in {FORECAST_STORE_PATH}")
+    if failed:
+        print(f"Forecasting failed for {len(failed)} segments: {failed}")
+
+
+if __name__ == "__main__":
+    main()
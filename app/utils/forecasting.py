@@ -0,0 +1,106 @@
+import importlib.util
+import os
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+FORECAST_PERIODS = 14
+MIN_FORECAST_POINTS = 3
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+PROPHET_PARAMS = (
+    ("changepoint_prior_scale", 0.5),
+    ("daily_seasonality", False),
+    ("weekly_seasonality", False),
+    ("seasonality_mode", "additive"),
+)
+# Smoothing, trend and damping values searched for the best one-step-ahead fit
+HOLT_PARAMS = (
+    ("alphas", (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)),
+    ("betas", (0.01, 0.05, 0.1, 0.2, 0.3)),
+    ("phis", (0.8, 0.85, 0.9, 0.95, 0.98)),
+    ("interval_width", 0.8),
+)
+
+
+def to_forecast_frame(daily, date_column="date", value_column="mean"):
+    """Daily averages as the ds/y frame the forecasting engines take"""
+    forecast_df = daily[[date_column, value_column]].set_axis(["ds", "y"], axis=1)
+    return forecast_df.dropna().reset_index(drop=True)
+
+
+def prophet_forecast(forecast_df, periods=FORECAST_PERIODS, params=PROPHET_PARAMS):
+    """The `periods` forecast rows of a Prophet fit on a daily ds/y series"""
+    from prophet import Prophet
+
+    model = Prophet(**dict(params))
+    model.fit(forecast_df)
+
+    future = model.make_future_dataframe(periods=periods, freq="D")
+    forecast = model.predict(future)
+    return forecast[FORECAST_COLUMNS].tail(periods).reset_index(drop=True)
+
+
+def holt_forecast(forecast_df, periods=FORECAST_PERIODS, params=HOLT_PARAMS):
+    """Damped-trend Holt exponential smoothing with residual-based prediction intervals.
+
+    Every parameter combination is fitted at once, vectorized over the grid,
+    and the one with the smallest one-step-ahead squared error is used.
+    Missing days are interpolated.
+    """
+    options = dict(params)
+    series = forecast_df.set_index("ds")["y"].asfreq("D").interpolate()
+    y = series.to_numpy(dtype=np.float64)
+
+    alpha, beta, phi = (
+        grid.ravel()
+        for grid in np.meshgrid(options["alphas"], options["betas"], options["phis"], indexing="ij")
+    )
+    level = np.full(alpha.shape, y[0])
+    trend = np.full(alpha.shape, y[1] - y[0])
+    errors = np.empty((len(y) - 1, len(alpha)))
+    for t in range(1, len(y)):
+        predicted = level + phi * trend
+        errors[t - 1] = y[t] - predicted
+        level = predicted + alpha * errors[t - 1]
+        trend = phi * trend + alpha * beta * errors[t - 1]
+
+    best = np.argmin(np.square(errors).sum(axis=0))
+    alpha, beta, phi = alpha[best], beta[best], phi[best]
+    steps = np.arange(1, periods + 1)
+    damping = np.cumsum(phi ** steps)
+    yhat = level[best] + damping * trend[best]
+
+    # h-step variance of the additive damped-trend model from the one-step residuals
+    sigma = np.sqrt(np.mean(np.square(errors[:, best])))
+    spread = np.square(alpha * (1 + beta * damping[:-1]))
+    margin = NormalDist().inv_cdf(0.5 + options["interval_width"] / 2) * sigma * np.sqrt(1 + np.r_[0, np.cumsum(spread)])
+
+    return pd.DataFrame({
+        "ds": series.index[-1] + pd.to_timedelta(steps, unit="D"),
+        "yhat": yhat,
+        "yhat_lower": yhat - margin,
+        "yhat_upper": yhat + margin,
+    })
+
+
+# engine name -> (forecast function, default parameters, module it needs)
+FORECAST_ENGINES = {
+    "prophet": (prophet_forecast, PROPHET_PARAMS, "prophet"),
+    "holt": (holt_forecast, HOLT_PARAMS, None),
+}
+DEFAULT_FORECAST_ENGINE = os.environ.get("FORECAST_ENGINE", "prophet")
+
+
+def available_engines():
+    """Engines whose dependencies are installed, the default first"""
+    engines = [
+        name for name, (_, _, module) in FORECAST_ENGINES.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+    return sorted(engines, key=lambda name: name != DEFAULT_FORECAST_ENGINE)
+
+
+def run_forecast(forecast_df, engine=DEFAULT_FORECAST_ENGINE, periods=FORECAST_PERIODS, params=None):
+    """Forecast rows from the named engine, with its default parameters unless given"""
+    forecast, default_params, _ = FORECAST_ENGINES[engine]
+    return forecast(forecast_df, periods, default_params if params is None else params)
@@ -0,0 +1,23 @@
+import os
+import uuid
+
+
+def write_parquet_atomic(df, path):
+    """Write df to path so readers only ever see the previous or the complete file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a private file first, then swap it in with an atomic rename
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        remove_file(temp_path)
+        raise
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
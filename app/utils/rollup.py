@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+ROLLUP_KEYS = ["date", "supplier", "car_group", "rental_period", "source"]
+ROLLUP_STATS = ["mean", "min", "max", "count"]
+
+
+def build_daily_rollup(df):
+    """total_price mean, min, max and count per day, supplier, car group, rental period and source"""
+    if df.empty:
+        return pd.DataFrame(columns=[*ROLLUP_KEYS, *ROLLUP_STATS])
+
+    keys = [df["snapshot_date"].rename("date"), *(df[column] for column in ROLLUP_KEYS[1:])]
+    return (
+        df["total_price"]
+        .astype(np.float64)
+        .groupby(keys, observed=True)
+        .agg(ROLLUP_STATS)
+        .reset_index()
+    )
+
+def slice_rollup(rollup, rental_period, car_group="All"):
+    """Rollup rows for one rental period and, unless "All", one car group"""
+    mask = rollup["rental_period"] == rental_period
+    if car_group != "All":
+        mask &= rollup["car_group"] == car_group
+    return rollup[mask]
+
+
+def summarize_rollup(rollup, by):
+    """Combine rollup rows per `by`, weighting each mean by its offer count"""
+    summary = (
+        rollup.assign(total=rollup["mean"] * rollup["count"])
+        .groupby(by, observed=True)
+        .agg(total=("total", "sum"), count=("count", "sum"), min=("min", "min"), max=("max", "max"))
+    )
+    summary.insert(0, "mean", summary["total"] / summary["count"])
+    return summary.drop(columns="total").reset_index()
+
+
+def summarize_all(rollup):
+    """Weighted mean, offer count, min and max over every rollup row"""
+    count = rollup["count"].sum()
+    return {
+        "mean": (rollup["mean"] * rollup["count"]).sum() / count if count else np.nan,
+        "count": int(count),
+        "min": rollup["min"].min(),
+        "max": rollup["max"].max(),
+    }
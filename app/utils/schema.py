@@ -0,0 +1,117 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["supplier", "car_group", "source", "make", "model", "transmission"]
+PRICE_COLUMNS = ["total_price", "price_per_day"]
+DATETIME_COLUMNS = ["pickup_datetime", "dropoff_datetime"]
+SMALL_INT_COLUMNS = ["rental_period", "day", "month", "year", "hour"]
+SNAPSHOT_PART_COLUMNS = ["year", "month", "day", "hour"]
+# Comma-separated supplier name fragments that identify our own brand, matched case-insensitively
+OWN_BRAND_PATTERNS = [
+    pattern.strip()
+    for pattern in os.environ.get("OWN_BRAND_PATTERNS", "GREEN MOTION").split(",")
+    if pattern.strip()
+]
+
+
+def parse_datetime_column(values):
+    # Handles both "2024-11-16T10:00:00" and "2024-11-16T10:00:00.000"
+    return pd.to_datetime(values, format="ISO8601", errors="coerce")
+
+
+def own_brand_mask(suppliers, patterns=OWN_BRAND_PATTERNS):
+    """Whether each supplier name contains one of the own-brand patterns"""
+    if not patterns:
+        return pd.Series(False, index=suppliers.index)
+
+    regex = "|".join(re.escape(pattern) for pattern in patterns)
+    if isinstance(suppliers.dtype, pd.CategoricalDtype):
+        # Match each distinct supplier once; missing suppliers (code -1) map to the trailing False
+        matches = np.asarray(suppliers.cat.categories.str.contains(regex, case=False), dtype=bool)
+        return pd.Series(np.r_[matches, False][suppliers.cat.codes.to_numpy()], index=suppliers.index)
+    return suppliers.str.contains(regex, case=False, na=False).astype(bool)
+
+
+def add_snapshot_dates(df):
+    """Add datetime64 snapshot_date and snapshot_datetime columns from year, month, day and hour"""
+    parts = df[SNAPSHOT_PART_COLUMNS].astype(np.int64)
+    # Snapshots share a handful of search times, so only the distinct ones are converted
+    keys = ((parts["year"] * 100 + parts["month"]) * 100 + parts["day"]) * 100 + parts["hour"]
+    codes, unique_keys = pd.factorize(keys.to_numpy())
+    unique_parts = pd.DataFrame({
+        "year": unique_keys // 1000000,
+        "month": unique_keys // 10000 % 100,
+        "day": unique_keys // 100 % 100,
+        "hour": unique_keys % 100,
+    })
+    snapshot_datetimes = pd.to_datetime(unique_parts).to_numpy()
+    df["snapshot_datetime"] = snapshot_datetimes[codes]
+    df["snapshot_date"] = snapshot_datetimes.astype("datetime64[D]").astype(snapshot_datetimes.dtype)[codes]
+    return df
+
+
+def concat_offers(dataframes):
+    """Concatenate normalised offer frames without losing their category dtypes"""
+    if not dataframes:
+        return pd.DataFrame()
+
+    for column in CATEGORY_COLUMNS:
+        dtypes = [df[column].dtype for df in dataframes if column in df]
+        if len(dtypes) == len(dataframes) and all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            # pd.concat falls back to object when categories differ, so align them first
+            categories = dtypes[0].categories
+            for dtype in dtypes[1:]:
+                categories = categories.union(dtype.categories)
+            dataframes = [
+                df.assign(**{column: df[column].cat.set_categories(categories)})
+                for df in dataframes
+            ]
+    return pd.concat(dataframes, ignore_index=True)
+
+
+def derive_custom_rental_periods(df):
+    """Replace rental_period "custom" with whole days between pickup and dropoff"""
+    if df.empty:
+        return df
+
+    df["pickup_datetime"] = parse_datetime_column(df["pickup_datetime"])
+    df["dropoff_datetime"] = parse_datetime_column(df["dropoff_datetime"])
+
+    is_custom = df["rental_period"].eq("custom")
+    rental_period = pd.to_numeric(df["rental_period"], errors="coerce")
+    df["rental_period"] = rental_period.mask(
+        is_custom, (df["dropoff_datetime"] - df["pickup_datetime"]).dt.days
+    )
+    return df
+
+
+def normalize_offers(df):
+    """Cast a combined offers frame to its compact typed schema"""
+    if df.empty:
+        return df
+
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+
+    if "supplier" in df:
+        df["is_green_motion"] = own_brand_mask(df["supplier"])
+
+    for column in PRICE_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(np.float32)
+
+    for column in DATETIME_COLUMNS:
+        if column in df and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = parse_datetime_column(df[column])
+
+    for column in SMALL_INT_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce", downcast="integer")
+
+    if all(column in df for column in SNAPSHOT_PART_COLUMNS) and not df[SNAPSHOT_PART_COLUMNS].isna().any().any():
+        df = add_snapshot_dates(df)
+
+    return df
@@ -0,0 +1,90 @@
+import os
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+from utils.parquet_io import remove_file, write_parquet_atomic
+
+CACHE_DIR = os.environ.get(
+    "SNAPSHOT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "greenmotion", "snapshots"),
+)
+MAX_CACHE_BYTES = int(os.environ.get("SNAPSHOT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+_eviction_lock = threading.Lock()
+
+
+def is_cacheable(search_datetime):
+    """Only snapshots from before today are final and safe to keep on disk"""
+    search_date = datetime.fromisoformat(search_datetime).date()
+    return search_date < datetime.now(timezone.utc).date()
+
+
+def cache_path(table_name, search_datetime):
+    file_name = f"{search_datetime.replace(':', '-')}.parquet"
+    return os.path.join(CACHE_DIR, table_name, file_name)
+
+
+def read_snapshot(table_name, search_datetime):
+    """Return the cached snapshot or None, marking it as recently used"""
+    path = cache_path(table_name, search_datetime)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+        os.utime(path)
+        return df
+    except Exception:
+        # A partial or unreadable file is treated as a miss and refetched
+        remove_file(path)
+        return None
+
+
+def write_snapshot(table_name, search_datetime, df):
+    # Concurrent readers never see half a file; a failed write just leaves a miss
+    try:
+        write_parquet_atomic(df, cache_path(table_name, search_datetime))
+    except Exception:
+        return
+
+    evict(MAX_CACHE_BYTES)
+
+
+def evict(max_bytes):
+    """Remove least recently used snapshots until the cache fits in max_bytes"""
+    with _eviction_lock:
+        entries = []
+        for root, _, files in os.walk(CACHE_DIR):
+            for file_name in files:
+                if not file_name.endswith(".parquet"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= max_bytes:
+                break
+            remove_file(path)
+            total_bytes -= size
+
+
+def get_or_fetch(table_name, search_datetime, fetch):
+    """Read-through lookup: serve final snapshots from disk, otherwise call fetch"""
+    if not is_cacheable(search_datetime):
+        return fetch()
+
+    df = read_snapshot(table_name, search_datetime)
+    if df is not None:
+        return df
+
+    df = fetch()
+    # Empty results may still be backfilled upstream and truncated ones are
+    # incomplete, so neither is cached
+    if not df.empty and not df.attrs.get("truncated"):
+        write_snapshot(table_name, search_datetime, df)
+    return df
@@ -0,0 +1,255 @@
+"""End-to-end timings for the frontend's data paths on synthetic markets.
+
+Runs every benchmark at each requested size, appends the results for the
+current git commit to benchmarks/results.jsonl and compares them with the most
+recent run recorded for a different commit.
+
+    python benchmarks/bench_data_paths.py
+    python benchmarks/bench_data_paths.py --sizes 10000 100000 --only matrix
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlsplit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(REPO_DIR, "app")
+RESULTS_PATH = os.path.join(REPO_DIR, "benchmarks", "results.jsonl")
+
+# Keep benchmark runs away from the user's snapshot cache and row cap
+os.environ.setdefault("SNAPSHOT_CACHE_DIR", tempfile.mkdtemp(prefix="greenmotion-bench-"))
+os.environ.setdefault("API_MAX_ROWS", str(10_000_000))
+sys.path.insert(0, APP_DIR)
+
+import requests  # noqa: E402
+import streamlit as st  # noqa: E402
+
+import api.utils as api_utils  # noqa: E402
+import data_viewer  # noqa: E402
+import display_data  # noqa: E402
+from api.mock import MockStore  # noqa: E402
+from api.synthetic import generate_market_data  # noqa: E402
+from components import charts, pricing_matrix, pricing_table  # noqa: E402
+from components.pricing_calculations import PriceRankIndex  # noqa: E402
+from utils import data_loader  # noqa: E402
+from utils.forecasting import available_engines  # noqa: E402
+from utils.rollup import build_daily_rollup, slice_rollup  # noqa: E402
+from utils.schema import normalize_offers  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RENTAL_PERIOD = 7
+DESIRED_POSITION = 3
+SWEEP_POSITIONS = 6
+
+
+class MockStoreAdapter(requests.adapters.BaseAdapter):
+    """Answers API requests from an in-process MockStore instead of the network"""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, **kwargs):
+        params = dict(parse_qsl(urlsplit(request.url).query))
+        rows = self.store.query(
+            params["table_name"],
+            params.get("search_datetime"),
+            params.get("pickup_datetime"),
+            params.get("dropoff_datetime"),
+            int(params.get("limit", 5)),
+            int(params.get("offset", 0)),
+        )
+        response = requests.Response()
+        response.status_code = 200
+        response._content = api_utils.orjson.dumps(rows) if api_utils.orjson else json.dumps(rows).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def bench_load_data(rows):
+    """data_viewer.load_data for one scheduled snapshot served by the mock store"""
+    store = MockStore(dataset="generated", rows_per_snapshot=max(rows // 3, 1))
+    session = api_utils.get_session()
+    session.mount(api_utils.BASE_URL.rstrip("/"), MockStoreAdapter(store))
+    search_datetime = datetime.now().strftime("%Y-%m-%dT%H:00:00")
+    # Generate the store's offers up front so only the frontend's work is timed
+    for source in data_loader.SITE_NAMES:
+        store.query(source, f"{search_datetime}:00", limit=0)
+
+    def run():
+        data_loader.snapshot_memo = data_loader.SnapshotMemo()
+        data_viewer.load_data(search_datetime, None, None, False)
+
+    return run
+
+
+def uncached_forecast_chart(rollup, engine):
+    """charts.create_forecast_chart with its fit cache cleared, so every call refits"""
+    charts.fit_forecast.clear()
+    return charts.create_forecast_chart(rollup, engine)
+
+
+def benchmarks_for(df):
+    period_df = df[df["rental_period"] == RENTAL_PERIOD]
+    car_group = period_df["car_group"].value_counts().index[0]
+    segment_df = period_df[period_df["car_group"] == car_group]
+    # Built once per loaded history in the app; the Market Analysis charts read slices of it.
+    # The plain chart keys keep timing the rollup from the raw rows, "[rollup]" keys
+    # time only the chart on a prebuilt slice
+    rollup = build_daily_rollup(df)
+    period_rollup = slice_rollup(rollup, RENTAL_PERIOD)
+    segment_rollup = slice_rollup(rollup, RENTAL_PERIOD, car_group)
+
+    # display_data reads the unfiltered frame from session state, as in the app
+    st.session_state.original_df = df
+    filtered_df = display_data.apply_filters(df, RENTAL_PERIOD, "All", "All")
+    # Built once per loaded snapshot in the app; position changes only query it.
+    # The plain keys keep timing the full build from the frame, "[index]" keys
+    # time only the queries against a prebuilt index
+    price_index = PriceRankIndex(df)
+    car_groups = sorted(df["car_group"].unique())
+    rental_periods = sorted(df["rental_period"].unique())
+
+    return {
+        "display_data.apply_filters": lambda: display_data.apply_filters(df, RENTAL_PERIOD, "All", "All"),
+        "display_data.display_results": lambda: display_data.display_results(filtered_df, RENTAL_PERIOD, "All", 3),
+        "pricing_calculations.PriceRankIndex": lambda: PriceRankIndex(df),
+        "pricing_matrix.build_matrix_data": lambda: pricing_matrix.build_matrix_data(
+            PriceRankIndex(df),
+            sorted(df["car_group"].unique()),
+            sorted(df["rental_period"].unique()),
+            DESIRED_POSITION,
+            False,
+        ),
+        "pricing_matrix.build_matrix_data[index]": lambda: pricing_matrix.build_matrix_data(
+            price_index, car_groups, rental_periods, DESIRED_POSITION, False
+        ),
+        "pricing_calculations.position_sweep": lambda: price_index.position_sweep(range(-1, SWEEP_POSITIONS - 1), False),
+        "pricing_table.create_pricing_table": lambda: pricing_table.create_pricing_table(
+            PriceRankIndex(segment_df), (car_group, RENTAL_PERIOD), DESIRED_POSITION, False
+        ),
+        "pricing_table.create_pricing_table[index]": lambda: pricing_table.create_pricing_table(
+            price_index, (car_group, RENTAL_PERIOD), DESIRED_POSITION, False
+        ),
+        "rollup.build_daily_rollup": lambda: build_daily_rollup(df),
+        "rollup.slice_rollup": lambda: slice_rollup(rollup, RENTAL_PERIOD, car_group),
+        "charts.create_daily_price_chart": lambda: charts.create_daily_price_chart(
+            slice_rollup(build_daily_rollup(period_df), RENTAL_PERIOD)
+        ),
+        "charts.create_daily_price_chart[rollup]": lambda: charts.create_daily_price_chart(period_rollup),
+        "charts.create_pace_chart": lambda: charts.create_pace_chart(
+            slice_rollup(build_daily_rollup(period_df), RENTAL_PERIOD)
+        ),
+        "charts.create_pace_chart[rollup]": lambda: charts.create_pace_chart(period_rollup),
+        "charts.create_competitor_chart": lambda: charts.create_competitor_chart(
+            slice_rollup(build_daily_rollup(period_df), RENTAL_PERIOD)
+        ),
+        "charts.create_competitor_chart[rollup]": lambda: charts.create_competitor_chart(period_rollup),
+        "charts.create_price_distribution_plot": lambda: charts.create_price_distribution_plot(period_df),
+        "charts.prepare_forecast_data": lambda: charts.prepare_forecast_data(
+            slice_rollup(build_daily_rollup(segment_df), RENTAL_PERIOD, car_group)
+        ),
+        "charts.prepare_forecast_data[rollup]": lambda: charts.prepare_forecast_data(segment_rollup),
+        # One key per installed engine, so runs without Prophet still time Holt
+        **{
+            f"charts.create_forecast_chart[{engine}]": lambda engine=engine: uncached_forecast_chart(segment_rollup, engine)
+            for engine in available_engines()
+        },
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_previous_results(commit):
+    """Latest recorded timing per (benchmark, rows) from any other commit"""
+    if not os.path.exists(RESULTS_PATH):
+        return {}
+
+    previous = {}
+    with open(RESULTS_PATH) as f:
+        for line in f:
+            result = json.loads(line)
+            if result["commit"] != commit:
+                previous[(result["benchmark"], result["rows"])] = result
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--no-record", action="store_true", help="Do not append results to results.jsonl")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    previous = load_previous_results(commit)
+    results = []
+    regressions = []
+
+    for rows in args.sizes:
+        df = normalize_offers(generate_market_data(rows))
+        benchmarks = {"data_viewer.load_data": bench_load_data(rows), **benchmarks_for(df)}
+
+        for name, func in benchmarks.items():
+            if args.only and args.only not in name:
+                continue
+
+            best, median = time_call(func, args.repeat)
+            result = {
+                "commit": commit,
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "benchmark": name,
+                "rows": rows,
+                "best_s": round(best, 6),
+                "median_s": round(median, 6),
+            }
+            results.append(result)
+
+            baseline = previous.get((name, rows))
+            change = ""
+            if baseline:
+                ratio = best / baseline["best_s"] - 1
+                change = f"{ratio:+.0%} vs {baseline['commit']}"
+                if ratio > args.threshold:
+                    regressions.append(result)
+                    change += "  REGRESSION"
+            print(f"{name:<44} {rows:>9,} rows  best {best * 1000:10.1f} ms  median {median * 1000:10.1f} ms  {change}")
+
+    if not args.no_record:
+        with open(RESULTS_PATH, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Accuracy and latency of the forecasting engines on synthetic market history.
+
+Builds the daily rollup of a synthetic market, takes prepare_forecast_data
+output for a sample of (car_group, rental_period) segments, holds out the last
+days of each series and fits every installed engine on the rest.
+
+    python benchmarks/bench_forecasting.py
+    python benchmarks/bench_forecasting.py --days 90 --segments 50 --holdout 14
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "app"))
+
+from api.synthetic import generate_market_data  # noqa: E402
+from components.charts import prepare_forecast_data  # noqa: E402
+from utils.forecasting import FORECAST_ENGINES, available_engines, run_forecast  # noqa: E402
+from utils.rollup import build_daily_rollup, slice_rollup  # noqa: E402
+from utils.schema import normalize_offers  # noqa: E402
+
+
+def sample_series(rows, days, segments, seed):
+    """prepare_forecast_data output for a random sample of segments"""
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    search_datetimes = [today - timedelta(days=day) for day in range(days, 0, -1)]
+    rollup = build_daily_rollup(normalize_offers(generate_market_data(rows, search_datetimes)))
+
+    keys = rollup[["car_group", "rental_period"]].drop_duplicates().to_numpy()
+    rng = np.random.default_rng(seed)
+    chosen = keys[rng.choice(len(keys), size=min(segments, len(keys)), replace=False)]
+    return [prepare_forecast_data(slice_rollup(rollup, rental_period, car_group)) for car_group, rental_period in chosen]
+
+
+def evaluate(engine, series, holdout):
+    """Fit latency and holdout errors of one engine over every series"""
+    latencies, absolute_errors, percentage_errors, covered = [], [], [], []
+    for forecast_df in series:
+        history, actual = forecast_df.iloc[:-holdout], forecast_df.iloc[-holdout:]
+        start = time.perf_counter()
+        forecast = run_forecast(history, engine, periods=holdout)
+        latencies.append(time.perf_counter() - start)
+
+        # Align on dates, since a series can skip days
+        matched = actual.merge(forecast, on="ds")
+        errors = (matched["yhat"] - matched["y"]).abs()
+        absolute_errors.extend(errors)
+        percentage_errors.extend(errors / matched["y"].abs())
+        covered.extend(matched["y"].between(matched["yhat_lower"], matched["yhat_upper"]))
+
+    return {
+        "median_ms": statistics.median(latencies) * 1000,
+        "total_s": sum(latencies),
+        "mae": float(np.mean(absolute_errors)),
+        "mape": float(np.mean(percentage_errors)) * 100,
+        "coverage": float(np.mean(covered)) * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Offers across the whole history")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--segments", type=int, default=30)
+    parser.add_argument("--holdout", type=int, default=7, help="Trailing days held out for scoring")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    series = [
+        forecast_df
+        for forecast_df in sample_series(args.rows, args.days, args.segments, args.seed)
+        if len(forecast_df) >= args.holdout + 3
+    ]
+    engines = available_engines()
+    missing = sorted(set(FORECAST_ENGINES) - set(engines))
+    print(f"{len(series)} series, {args.holdout}-day holdout" + (f"; not installed: {', '.join(missing)}" if missing else ""))
+
+    for engine in engines:
+        result = evaluate(engine, series, args.holdout)
+        print(
+            f"{engine:<10} median fit {result['median_ms']:9.1f} ms  total {result['total_s']:7.2f} s  "
+            f"MAE {result['mae']:8.2f}  MAPE {result['mape']:6.2f}%  interval coverage {result['coverage']:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()